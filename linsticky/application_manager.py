@@ -19,6 +19,7 @@ from gi.repository import Gtk, Adw, Gdk, GLib
 
 from config.config import get_app_paths, load_app_info
 from views.main_view.main_view import MainWindow
+from sticky.sticky_styles import load_css
 
 _ = builtins._
 
@@ -88,7 +89,7 @@ class ApplicationManager:
         }}
         """
         provider = Gtk.CssProvider()
-        provider.load_from_data(custom_css.encode())
+        load_css(provider, custom_css)
         Gtk.StyleContext.add_provider_for_display(
             Gdk.Display.get_default(),
             provider,
@@ -7,6 +7,11 @@ from config.config_manager import ConfigManager
 class NotesDB:
     """Manages the SQLite database for sticky notes."""
 
+    # Autosave statements. sqlite3 keeps prepared statements in a per-connection
+    # cache keyed by the SQL text, so the hot save paths always reuse these.
+    _UPDATE_SQL = "UPDATE notes SET content=?, x=?, y=?, w=?, h=?, color=?, always_on_top=? WHERE id=?"
+    _UPDATE_GEOMETRY_SQL = "UPDATE notes SET x=?, y=?, w=?, h=? WHERE id=?"
+
     def __init__(self, path: str):
         """
         Initializes the database connection and ensures tables are created.
@@ -15,8 +20,28 @@ class NotesDB:
         """
         self.conn = sqlite3.connect(path)
         self.conn.row_factory = sqlite3.Row
+        self._configure_connection(path)
         self._create_table()
 
+    def _configure_connection(self, path: str):
+        """
+        Tunes the connection for the frequent small autosave updates.
+        WAL journaling with synchronous=NORMAL turns each save into an append
+        with a single fsync and keeps reads from blocking on writes. In-memory
+        databases have no journal file, so they are left untouched.
+        Args:
+            path (str): The path the connection was opened with.
+        """
+        if path == ":memory:" or path.startswith("file::memory:"):
+            return
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+            self.conn.execute("PRAGMA wal_autocheckpoint=1000")
+        except sqlite3.DatabaseError as e:
+            print(f"WARNING: Could not enable WAL mode for {path}: {e}")
+
     def close(self):
         """Closes the database connection."""
         if self.conn:
@@ -120,10 +145,23 @@ class NotesDB:
         """
         with self.conn:
             self.conn.execute(
-                "UPDATE notes SET content=?, x=?, y=?, w=?, h=?, color=?, always_on_top=? WHERE id=?",
+                self._UPDATE_SQL,
                 (content, x, y, w, h, color, always_on_top, note_id)
             )
 
+    def update_geometry(self, note_id: int, x: int, y: int, w: int, h: int):
+        """
+        Updates only the window geometry of an existing note.
+        Args:
+            note_id (int): The ID of the note to update.
+            x (int): X-coordinate of the note window.
+            y (int): Y-coordinate of the note window.
+            w (int): Width of the note window.
+            h (int): Height of the note window.
+        """
+        with self.conn:
+            self.conn.execute(self._UPDATE_GEOMETRY_SQL, (x, y, w, h, note_id))
+
     def get(self, note_id: int) -> sqlite3.Row:
         """
         Retrieves a single note by its ID.
@@ -195,6 +233,16 @@ class NotesDB:
         with self.conn:
             self.conn.execute("DELETE FROM notes WHERE id=?", (note_id,))
 
+    def delete_all_trash(self) -> int:
+        """
+        Permanently deletes every note in the trash in a single transaction.
+        Returns:
+            int: The number of deleted notes.
+        """
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM notes WHERE deleted=1")
+        return cur.rowcount
+
     def update_color(self, note_id: int, color: str):
         """
         Updates the background color of a specific note.
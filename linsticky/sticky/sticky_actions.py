@@ -5,65 +5,165 @@ This module provides methods for loading, saving, and printing note data.
 It handles the serialization of the text buffer's content and formatting
 into a JSON structure suitable for database storage.
 """
+import binascii
 import json
 from gi.repository import Gtk, GLib, Pango, PangoCairo
 from .customization_dialog import CustomizationDialog
 
+# Pango attribute constructors for the standard format tags, used when printing.
+_PRINT_FORMAT_ATTRS = {
+    "bold": lambda: Pango.attr_weight_new(Pango.Weight.BOLD),
+    "italic": lambda: Pango.attr_style_new(Pango.Style.ITALIC),
+    "underline": lambda: Pango.attr_underline_new(Pango.Underline.SINGLE),
+    "strikethrough": lambda: Pango.attr_strikethrough_new(True),
+}
+
+
+def decode_note_content(content: str) -> list:
+    """
+    Decodes the stored content column of a note into its segments.
+
+    Current notes hold the JSON text itself. Notes written by older versions
+    hold it hex-encoded; they are rewritten as plain JSON on their next save.
+
+    Args:
+        content: The raw content column of the note.
+
+    Returns:
+        The deserialized list of {"text", "tags"} dictionaries.
+
+    Raises:
+        ValueError: If the content is in neither format (e.g. legacy plain text).
+    """
+    if content.startswith("["):
+        return json.loads(content)
+    # `json.loads` accepts the unhexlified UTF-8 bytes directly, so no decode
+    # pass is needed.
+    return json.loads(binascii.unhexlify(content))
+
+
+def _merge_segment_runs(segments: list) -> list:
+    """
+    Merges adjacent segments that share the same tags into single runs.
+
+    Args:
+        segments: The deserialized list of {"text", "tags"} dictionaries.
+
+    Returns:
+        A list of (text, tags) tuples with no two neighbours sharing tags.
+    """
+    runs = []
+    for seg in segments:
+        text, tags = seg.get("text", ""), tuple(seg.get("tags", []))
+        if not text:
+            continue
+        if runs and runs[-1][1] == tags:
+            runs[-1][0].append(text)
+        else:
+            runs.append(([text], tags))
+    return [("".join(parts), tags) for parts, tags in runs]
+
 
 class StickyActions:
     """
     A mixin class for `StickyWindow` that encapsulates data-related actions
     like loading from DB, saving, and printing.
     """
+    # Attributes holding GLib source ids that must not outlive the window.
+    _SOURCE_ATTRS = ("_save_pending_id", "_dirty_source", "_configure_source", "_cursor_source", "_load_source_id")
 
-    def load_from_db(self):
+    def load_from_db(self, prefetched=None):
         """
         Fetches note data from the database and populates the UI.
         
         This method loads the note's content, color, and geometry, and applies
         them to the window. It supports both the modern JSON-based format and
         a legacy plain-text format for backward compatibility.
+
+        Color and geometry are applied immediately, while decoding the content
+        and filling the text buffer is deferred to an idle callback so that the
+        window can be mapped without waiting for it. The window stays in the
+        loading state, and the text view read-only, until the content is in
+        place, so nothing typed in the meantime is overwritten by the fill.
+
+        Args:
+            prefetched: The note row if the caller already fetched it, which
+                saves a second query during window construction.
         """
         if not self.note_id:
+            self._loading = False
             return
 
-        row = self.db.get(self.note_id)
+        row = prefetched if prefetched is not None else self.db.get(self.note_id)
         if not row:
             print(f"WARNING: Note with ID {self.note_id} not found in database.")
+            self._loading = False
             return
 
         self._loading = True
 
-        content = row["content"] or ""
-        self.buffer.set_text("")
-
-        try:
-            # New format: JSON string stored as a hex-encoded blob.
-            segments = json.loads(bytes.fromhex(content).decode('utf-8'))
-            iter_pos = self.buffer.get_start_iter()
-            for seg in segments:
-                text, tags = seg.get("text", ""), seg.get("tags", [])
-                if tags:
-                    self.buffer.insert_with_tags_by_name(iter_pos, text, *tags)
-                else:
-                    self.buffer.insert(iter_pos, text)
-        except (ValueError, TypeError):
-            # Fallback for legacy plain text format.
-            self.buffer.set_text(content.replace("<br>", "\n"))
-
         # Restore window state.
         self.apply_color(row["color"] or "#FFF59D")
         self.saved_width = row['w'] or 300
         self.saved_height = row['h'] or 380
         self.saved_x = row['x'] or 300
         self.saved_y = row['y'] or 300
+        # What the row holds now, so a save that would write it back unchanged is skipped.
+        self._saved_state = (row["content"] or "", self.current_color, row["always_on_top"] or 0)
+        self._saved_geometry = (self.saved_x, self.saved_y, self.saved_width, self.saved_height)
+
+        self.text_view.set_editable(False)
+        self._load_source_id = GLib.idle_add(self._finish_load_content, row["content"] or "")
+
+    def _finish_load_content(self, content: str) -> bool:
+        """
+        Decodes the stored note content and fills the text buffer.
+
+        Args:
+            content: The raw content column of the note.
+
+        Returns:
+            False to remove the idle source.
+        """
+        self._load_source_id = 0
+        if self._is_destroying:
+            return False
+
+        # Block the `changed` handler while the buffer is filled; nothing has to
+        # react to the intermediate states of a bulk load.
+        self.buffer.handler_block_by_func(self._on_buffer_changed)
+        try:
+            self.buffer.set_text("")
+            try:
+                segments = decode_note_content(content)
+                iter_pos = self.buffer.get_start_iter()
+                tags_by_name = self._tags_by_name
+                for text, tags in _merge_segment_runs(segments):
+                    # Names of tags no longer in the config are dropped.
+                    tag_objs = [tags_by_name[n] for n in tags if n in tags_by_name]
+                    if tag_objs:
+                        self.buffer.insert_with_tags(iter_pos, text, *tag_objs)
+                    else:
+                        self.buffer.insert(iter_pos, text)
+            except (ValueError, TypeError, AttributeError):
+                # Fallback for legacy plain text format.
+                self.buffer.set_text(content.replace("<br>", "\n"))
+        finally:
+            self.buffer.handler_unblock_by_func(self._on_buffer_changed)
 
+        self.text_view.set_editable(True)
         self._loading = False
+        return False
 
     def save(self, force: bool = False):
         """
         Saves the current state of the note (content, geometry, color) to the database.
 
+        The write is skipped when neither the content nor the geometry has changed
+        since the last successful save, and a geometry-only change (moving or
+        resizing the window) is written without serializing the buffer. Values
+        equal to what was last written or loaded are not written again.
+
         Args:
             force: If True, bypasses the check that prevents saving during destruction.
         """
@@ -71,12 +171,10 @@ class StickyActions:
             return False
         if getattr(self, '_loading', True):
             return True
+        if not (self._dirty or self._geom_dirty):
+            return True
 
         try:
-            # Get the raw buffer data and encode it for database storage.
-            segments = self._get_buffer_segments()
-            hex_data = json.dumps(segments).encode('utf-8').hex()
-            
             w = self.get_width() if self.get_visible() else self.saved_width
             h = self.get_height() if self.get_visible() else self.saved_height
             
@@ -84,53 +182,201 @@ class StickyActions:
             x, y = getattr(self, 'saved_x', 300), getattr(self, 'saved_y', 300)
 
             if self.note_id:
-                self.db.update(
-                    self.note_id, hex_data, x, y, w, h,
-                    self.current_color, 1 if getattr(self, 'is_pinned', False) else 0
-                )
+                geometry = (x, y, w, h)
+                if self._dirty:
+                    # Colour or pin changes leave the text alone, so the last
+                    # serialized content is reused unless the buffer was edited.
+                    if self._text_dirty or self._last_content is None:
+                        segments = self._get_buffer_segments()
+                        # Compact, non-escaped JSON: the smallest text for the C encoder to write.
+                        self._last_content = json.dumps(segments, separators=(',', ':'), ensure_ascii=False)
+                    state = (self._last_content, self.current_color, 1 if getattr(self, 'is_pinned', False) else 0)
+                    # Edits that cancel out (e.g. bold toggled twice) serialize
+                    # back to the stored content and skip the full update.
+                    if state != self._saved_state:
+                        self.db.update(self.note_id, state[0], x, y, w, h, state[1], state[2])
+                        self._saved_state = state
+                        self._saved_geometry = geometry
+                # A move or resize that ends where the last save left the window
+                # writes nothing.
+                if geometry != self._saved_geometry:
+                    self.db.update_geometry(self.note_id, x, y, w, h)
+                    self._saved_geometry = geometry
                 self.saved_width, self.saved_height = w, h
+                self._dirty = False
+                self._text_dirty = False
+                self._geom_dirty = False
         except Exception as e:
             print(f"ERROR: Failed to save note {self.note_id}: {e}")
         return True
 
-    def _get_buffer_segments(self) -> list:
+    def _schedule_save(self):
+        """
+        Arms a one-shot timer that saves the note shortly after a change.
+
+        Further changes while the timer is pending are coalesced into the same
+        write, so database traffic follows edits rather than wall-clock time.
+        """
+        if self._save_pending_id or self._is_destroying:
+            return
+        self._save_pending_id = GLib.timeout_add(1500, self._flush_save)
+
+    def _save_now(self):
+        """Runs a pending debounced save immediately instead of waiting for its timer."""
+        if self._save_pending_id:
+            GLib.source_remove(self._save_pending_id)
+            self._save_pending_id = 0
+            self.save()
+
+    def _flush_save(self) -> bool:
+        """
+        Timer callback that performs a debounced save.
+
+        Returns:
+            False to remove the one-shot timer source.
+        """
+        self._save_pending_id = 0
+        if not self._is_destroying:
+            self.save()
+        return False
+
+    def _get_buffer_segments(self, end_iter: Gtk.TextIter = None) -> list:
         """
         Serializes the text buffer's content and tags into a list of dictionaries.
 
+        Args:
+            end_iter: Optional position to stop at. Defaults to the end of the buffer.
+
         Returns:
             A list of segments, where each segment is a dict with "text" and "tags".
         """
-        start_iter, end_iter = self.buffer.get_bounds()
-        segments = []
-        while not start_iter.equal(end_iter):
+        start_iter, buffer_end = self.buffer.get_bounds()
+        if end_iter is None:
+            end_iter = buffer_end
+        end_offset = end_iter.get_offset()
+        tag_names = self._tag_names
+
+        # Collect text and tag names in parallel lists; dicts are built once at the end.
+        texts, tag_lists = [], []
+        while start_iter.get_offset() < end_offset:
             next_iter = start_iter.copy()
-            if not next_iter.forward_to_tag_toggle(None):
+            if not next_iter.forward_to_tag_toggle(None) or next_iter.get_offset() > end_offset:
                 next_iter = end_iter
             text = self.buffer.get_text(start_iter, next_iter, True)
-            active_tags = [t.get_property("name") for t in start_iter.get_tags() if t.get_property("name")]
             if text:
-                segments.append({"text": text, "tags": active_tags})
+                texts.append(text)
+                tag_lists.append([name for t in start_iter.get_tags() if (name := tag_names.get(t))])
             start_iter = next_iter
-        if not segments:
-            segments = [{"text": "", "tags": []}]
-        
-        return segments
+
+        if not texts:
+            return [{"text": "", "tags": []}]
+        return [{"text": text, "tags": tags} for text, tags in zip(texts, tag_lists)]
 
     def on_print_clicked(self, _):
         """Initializes a print operation for the current note."""
         print_op = Gtk.PrintOperation()
+        print_op.connect("begin-print", self._begin_print)
         print_op.connect("draw-page", self._draw_page_for_printing)
-        print_op.set_n_pages(1)
+        print_op.connect("end-print", self._end_print)
         print_op.run(Gtk.PrintOperationAction.PRINT_DIALOG, self)
 
-    def _draw_page_for_printing(self, operation, context, page_nr):
-        """Renders the note's content into the print context."""
-        cr = context.get_cairo_context()
+    def _print_attribute(self, tag):
+        """
+        Returns a new Pango attribute rendering a buffer tag, or None for unknown tags.
+
+        Args:
+            tag: The Gtk.TextTag to translate.
+        """
+        size = self._tag_to_font_size.get(tag)
+        if size is not None:
+            return Pango.attr_size_new(size * Pango.SCALE)
+        color = self._tag_to_text_color.get(tag)
+        if color is not None:
+            pango_color = Pango.Color()
+            if pango_color.parse(color):
+                return Pango.attr_foreground_new(pango_color.red, pango_color.green, pango_color.blue)
+            return None
+        make_attr = _PRINT_FORMAT_ATTRS.get(self._tag_names.get(tag))
+        return make_attr() if make_attr else None
+
+    def _begin_print(self, operation, context):
+        """
+        Lays the formatted note out once and splits its lines into pages.
+
+        The layout carries the buffer's tags as Pango attributes, built in a
+        single walk over the tag toggles, and is reused by every `draw-page`.
+        """
+        attrs = Pango.AttrList()
+        texts = []
+        byte_pos = 0
+        it, end = self.buffer.get_bounds()
+        while it.compare(end) < 0:
+            next_iter = it.copy()
+            if not next_iter.forward_to_tag_toggle(None):
+                next_iter = end
+            text = self.buffer.get_text(it, next_iter, False)
+            # Pango attribute ranges are UTF-8 byte offsets.
+            length = len(text.encode('utf-8'))
+            if length:
+                for tag in it.get_tags():
+                    attr = self._print_attribute(tag)
+                    if attr is not None:
+                        attr.start_index = byte_pos
+                        attr.end_index = byte_pos + length
+                        attrs.insert(attr)
+                texts.append(text)
+                byte_pos += length
+            it = next_iter
+
         layout = context.create_pango_layout()
-        start, end = self.buffer.get_bounds()
-        layout.set_text(self.buffer.get_text(start, end, False), -1)
+        layout.set_text("".join(texts), -1)
+        layout.set_attributes(attrs)
         layout.set_width(int(context.get_width() * Pango.SCALE))
-        PangoCairo.show_layout(cr, layout)
+
+        # Index of the first line on each page.
+        page_height = context.get_height() * Pango.SCALE
+        page_starts = [0]
+        page_top = 0
+        line_iter = layout.get_iter()
+        line_nr = 0
+        while True:
+            _, logical = line_iter.get_line_extents()
+            if line_nr != page_starts[-1] and logical.y + logical.height - page_top > page_height:
+                page_starts.append(line_nr)
+                page_top = logical.y
+            line_nr += 1
+            if not line_iter.next_line():
+                break
+
+        self._print_layout = layout
+        self._print_page_starts = page_starts
+        operation.set_n_pages(len(page_starts))
+
+    def _draw_page_for_printing(self, operation, context, page_nr):
+        """Renders one page of the prepared layout into the print context."""
+        cr = context.get_cairo_context()
+        starts = self._print_page_starts
+        first = starts[page_nr]
+        last = starts[page_nr + 1] if page_nr + 1 < len(starts) else self._print_layout.get_line_count()
+
+        line_iter = self._print_layout.get_iter()
+        line_nr = 0
+        page_top = None
+        while line_nr < last:
+            if line_nr >= first:
+                _, logical = line_iter.get_line_extents()
+                if page_top is None:
+                    page_top = logical.y
+                cr.move_to(logical.x / Pango.SCALE, (line_iter.get_baseline() - page_top) / Pango.SCALE)
+                PangoCairo.show_layout_line(cr, line_iter.get_line_readonly())
+            line_nr += 1
+            if not line_iter.next_line():
+                break
+
+    def _end_print(self, operation, context):
+        """Releases the layout prepared for printing."""
+        self._print_layout = None
+        self._print_page_starts = None
 
     def on_customization_clicked(self, _):
         """Opens the customization dialog."""
@@ -151,9 +397,12 @@ class StickyActions:
         except Exception as e:
             print(f"ERROR: Final save on close failed for note {self.note_id}: {e}")
         
-        if hasattr(self, 'save_timer_id') and self.save_timer_id:
-            GLib.source_remove(self.save_timer_id)
-            self.save_timer_id = None
+        # Drop every pending main-loop callback so nothing runs on a dead window.
+        for attr in self._SOURCE_ATTRS:
+            source_id = getattr(self, attr)
+            if source_id:
+                GLib.source_remove(source_id)
+                setattr(self, attr, 0)
 
         if self.main_window:
             self.main_window.on_sticky_closed(self.note_id)
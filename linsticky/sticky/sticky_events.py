@@ -5,7 +5,21 @@ This module contains the mixin class responsible for handling all user
 interactions with a sticky note, including button clicks, drag-and-drop
 for moving, resizing gestures, and keyboard shortcuts.
 """
-from gi.repository import Gtk, Gdk
+from gi.repository import Gtk, Gdk, GLib
+
+# Number of lines shown by the preview card in the main window.
+PREVIEW_LINES = 5
+
+# Ctrl (and Ctrl+Shift) shortcuts mapped to format tag names, keyed by keyval
+# so a key press resolves with a single dict lookup.
+_FORMAT_SHORTCUTS = {
+    Gdk.KEY_B: "bold", Gdk.KEY_b: "bold",
+    Gdk.KEY_I: "italic", Gdk.KEY_i: "italic",
+    Gdk.KEY_U: "underline", Gdk.KEY_u: "underline",
+}
+_SHIFT_FORMAT_SHORTCUTS = {
+    Gdk.KEY_S: "strikethrough", Gdk.KEY_s: "strikethrough",
+}
 
 
 class StickyEvents:
@@ -25,9 +39,11 @@ class StickyEvents:
 
     def _on_close_clicked(self, button: Gtk.Button):
         """
-        Handles the 'close' button click, ensuring the note is saved before closing.
+        Handles the 'close' button click.
+
+        The note is saved by the close-request handler, so no separate save is
+        needed here.
         """
-        self.save()
         self.close()
 
     def _on_resize_pressed(self, gesture: Gtk.GestureClick, n_press: int, x: float, y: float):
@@ -38,7 +54,7 @@ class StickyEvents:
         if not surface:
             return
             
-        size = int(16 * self.scale)
+        size = self._s[16]
         window_x = self.get_width() - (size - x)
         window_y = self.get_height() - (size - y)
         
@@ -62,20 +78,22 @@ class StickyEvents:
     def _on_header_drag_update(self, gesture: Gtk.GestureDrag, dx: float, dy: float):
         """
         Updates the note's position coordinates during a drag operation.
-        This is primarily for X11 compatibility where continuous updates are needed.
+        It is only connected on X11, where continuous updates are needed.
         """
-        if "X11" in Gdk.Display.get_default().__class__.__name__:
-            self.saved_x += dx
-            self.saved_y += dy
+        self.saved_x += dx
+        self.saved_y += dy
+        self._geom_dirty = True
+        self._schedule_save()
 
     def _on_header_drag_end(self, gesture: Gtk.GestureDrag, dx: float, dy: float):
         """
         Finalizes the note's position after a drag operation is complete.
         """
         # The final position is implicitly handled by the window manager in Wayland.
-        # For X11, the continuous updates in `_on_header_drag_update` are sufficient.
-        # This method is kept for potential future logic.
-        pass
+        # On X11 the position tracked during the drag is written out right away
+        # instead of waiting for the debounced save.
+        if self._geom_dirty:
+            self._save_now()
 
     def _on_map(self, widget: Gtk.Widget):
         """
@@ -84,15 +102,58 @@ class StickyEvents:
         if self.saved_width > 0 and self.saved_height > 0:
             self.set_default_size(self.saved_width, self.saved_height)
 
+    def _on_unmap(self, widget: Gtk.Widget):
+        """
+        Writes out a pending debounced save when the window is hidden, so
+        edits are not left waiting on a timer of a window nobody looks at.
+        """
+        self._save_now()
+
     def _on_buffer_changed(self, buffer: Gtk.TextBuffer):
         """
-        Handles the 'changed' signal from the text buffer to update the main
-        window's preview card in real-time.
+        Handles the 'changed' signal from the text buffer to mark the note as
+        needing a save and schedule a refresh of the main window's preview card.
+
+        The preview refresh is throttled rather than debounced: the timer is not
+        restarted by further keystrokes, so the card follows continuous typing
+        at most four times a second and always ends on the latest content.
         """
-        if not getattr(self, '_loading', True) and self.main_window:
-            # Pass the raw segment data for real-time preview generation.
-            segments = self._get_buffer_segments()
-            self.main_window.update_card_text(self.note_id, segments)
+        if getattr(self, '_loading', True):
+            return
+        self._dirty = True
+        self._text_dirty = True
+        self._schedule_save()
+        if self.main_window and not self._dirty_source:
+            self._dirty_source = GLib.timeout_add(250, self._flush_dirty)
+
+    def _flush_dirty(self) -> bool:
+        """
+        Timer callback that refreshes the main window's preview card.
+
+        Returns:
+            False to remove the one-shot timer source.
+        """
+        self._dirty_source = 0
+        self.refresh_preview()
+        return False
+
+    def refresh_preview(self):
+        """
+        Pushes the current buffer content to the main window's preview card.
+
+        While the main window is hidden nothing is serialized; the card is only
+        marked stale and refreshed when the window is shown again.
+        """
+        if not self.main_window or self._is_destroying:
+            return
+        if not self.main_window.get_mapped():
+            self.main_window.mark_card_stale(self.note_id)
+            return
+        # The card only renders the first few lines, so serialize just those;
+        # the full buffer is serialized by `save()` for persistence.
+        _, preview_end = self.buffer.get_iter_at_line(PREVIEW_LINES)
+        segments = self._get_buffer_segments(preview_end)
+        self.main_window.update_card_text(self.note_id, segments)
 
     def _on_key_pressed(self, controller, keyval, keycode, state) -> bool:
         """
@@ -104,27 +165,16 @@ class StickyEvents:
         if not ctrl_pressed:
             return False
 
-        key_map = {
-            (Gdk.KEY_B, Gdk.KEY_b): "bold",
-            (Gdk.KEY_I, Gdk.KEY_i): "italic",
-            (Gdk.KEY_U, Gdk.KEY_u): "underline",
-        }
-        shift_key_map = {
-            (Gdk.KEY_S, Gdk.KEY_s): "strikethrough",
-        }
-
         if shift_pressed:
-            for keys, format_tag in shift_key_map.items():
-                if keyval in keys:
-                    self.apply_format(format_tag)
-                    return True
             if keyval in (Gdk.KEY_L, Gdk.KEY_l):
                 self.toggle_bullet_list()
                 return True
+            format_tag = _SHIFT_FORMAT_SHORTCUTS.get(keyval)
         else:
-            for keys, format_tag in key_map.items():
-                if keyval in keys:
-                    self.apply_format(format_tag)
-                    return True
+            format_tag = _FORMAT_SHORTCUTS.get(keyval)
+
+        if format_tag is not None:
+            self.apply_format(format_tag)
+            return True
 
         return False
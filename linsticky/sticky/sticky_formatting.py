@@ -5,7 +5,28 @@ This module provides a mixin class that handles all text formatting operations
 within a sticky note's text buffer, such as applying bold/italic, changing
 colors, adjusting font sizes, and toggling bulleted lists.
 """
-from gi.repository import Gtk, Pango
+import sys
+
+from gi.repository import Pango
+
+# Interned tag names shared by all windows, keyed by (prefix, value). The
+# palette and size list come from the config, so they are filled on first use.
+_TAG_NAME_CACHE = {}
+
+
+def _tag_name(prefix: str, value) -> str:
+    """
+    Returns the interned buffer tag name for a dynamic formatting value.
+
+    Args:
+        prefix: The tag family prefix, e.g. "text_color_" or "font_size_".
+        value: The color string or font size the tag represents.
+    """
+    key = (prefix, value)
+    name = _TAG_NAME_CACHE.get(key)
+    if name is None:
+        name = _TAG_NAME_CACHE[key] = sys.intern(f"{prefix}{value}")
+    return name
 
 
 class StickyFormatting:
@@ -21,21 +42,65 @@ class StickyFormatting:
         self.tag_table = self.buffer.get_tag_table()
 
         # --- Standard Text Style Tags ---
-        self.buffer.create_tag("bold", weight=Pango.Weight.BOLD)
-        self.buffer.create_tag("italic", style=Pango.Style.ITALIC)
-        self.buffer.create_tag("underline", underline=Pango.Underline.SINGLE)
-        self.buffer.create_tag("strikethrough", strikethrough=True)
+        self._fmt_tags = {
+            "bold": self.buffer.create_tag("bold", weight=Pango.Weight.BOLD),
+            "italic": self.buffer.create_tag("italic", style=Pango.Style.ITALIC),
+            "underline": self.buffer.create_tag("underline", underline=Pango.Underline.SINGLE),
+            "strikethrough": self.buffer.create_tag("strikethrough", strikethrough=True),
+        }
+
+        # Map every tag to its name, so serialization avoids reading the
+        # GObject "name" property for each segment.
+        self._tag_names = {tag: name for name, tag in self._fmt_tags.items()}
 
         # --- Dynamic Tags from Configuration ---
         # Create a tag for each color in the palette.
-        text_colors = self.config.get("text_colors", [])
-        for color in text_colors:
-            self.buffer.create_tag(f"text_color_{color}", foreground=color)
+        self._text_color_tags = {}
+        self._tag_to_text_color = {}
+        for color in self.config.get("text_colors", []):
+            name = _tag_name("text_color_", color)
+            tag = self.buffer.create_tag(name, foreground=color)
+            self._text_color_tags[color] = tag
+            self._tag_to_text_color[tag] = color
+            self._tag_names[tag] = name
 
         # Create a tag for each font size, converting points to Pango units.
-        font_sizes = self.config.get("font_sizes", [])
-        for size in font_sizes:
-            self.buffer.create_tag(f"font_size_{size}", size=size * Pango.SCALE)
+        # Remember the size per tag so the cursor handler needs no name parsing.
+        self._font_size_tags = {}
+        self._tag_to_font_size = {}
+        for size in self.config.get("font_sizes", []):
+            name = _tag_name("font_size_", size)
+            tag = self.buffer.create_tag(name, size=size * Pango.SCALE)
+            self._font_size_tags[size] = tag
+            self._tag_to_font_size[tag] = size
+            self._tag_names[tag] = name
+
+        # Reverse map used when loading, so stored tag names resolve to tag
+        # objects without a tag table lookup per segment.
+        self._tags_by_name = {name: tag for tag, name in self._tag_names.items()}
+
+    def _tags_in_range(self, start, end, candidates) -> set:
+        """
+        Finds which of the given tags cover any part of a range.
+
+        The range is walked once along its tag toggles, instead of removing
+        every candidate tag over the whole range one after another.
+
+        Args:
+            start: The start of the range.
+            end: The end of the range.
+            candidates: A container of tags to look for (checked with `in`).
+
+        Returns:
+            The set of candidate tags present in the range.
+        """
+        found = {tag for tag in start.get_tags() if tag in candidates}
+        it = start.copy()
+        while it.forward_to_tag_toggle(None) and it.compare(end) < 0:
+            for tag in it.get_toggled_tags(True):
+                if tag in candidates:
+                    found.add(tag)
+        return found
 
     def apply_format(self, tag_name: str):
         """
@@ -49,7 +114,7 @@ class StickyFormatting:
             return
             
         start, end = bounds
-        tag = self.tag_table.lookup(tag_name)
+        tag = self._fmt_tags[tag_name]
         if start.has_tag(tag):
             self.buffer.remove_tag(tag, start, end)
         else:
@@ -73,12 +138,14 @@ class StickyFormatting:
             return
             
         start, end = bounds
-        # Remove all existing color tags from the selection first.
-        for color in self.config.get("text_colors", []):
-            self.buffer.remove_tag_by_name(f"text_color_{color}", start, end)
+        # Remove the color tags present in the selection first.
+        for tag in self._tags_in_range(start, end, self._tag_to_text_color):
+            self.buffer.remove_tag(tag, start, end)
         
         # Apply the new color tag.
-        self.buffer.apply_tag_by_name(f"text_color_{hex_color}", start, end)
+        tag = self._text_color_tags.get(hex_color)
+        if tag is not None:
+            self.buffer.apply_tag(tag, start, end)
 
         self.text_view.grab_focus()
         self._on_buffer_changed(self.buffer)
@@ -98,15 +165,18 @@ class StickyFormatting:
             return
             
         start, end = bounds
-        # Remove all existing font size tags from the selection.
-        for s in self.config.get("font_sizes", []):
-            self.buffer.remove_tag_by_name(f"font_size_{s}", start, end)
+        # Remove the font size tags present in the selection.
+        for tag in self._tags_in_range(start, end, self._tag_to_font_size):
+            self.buffer.remove_tag(tag, start, end)
         
         # Apply the new size tag.
-        self.buffer.apply_tag_by_name(f"font_size_{size}", start, end)
+        tag = self._font_size_tags.get(size)
+        if tag is not None:
+            self.buffer.apply_tag(tag, start, end)
 
-        if hasattr(self, 'btn_font_size'):
+        if hasattr(self, 'btn_font_size') and size != self._last_shown_font:
             self.btn_font_size.set_label(str(size))
+            self._last_shown_font = size
 
         self.text_view.grab_focus()
         self._on_buffer_changed(self.buffer)
@@ -116,34 +186,35 @@ class StickyFormatting:
         Toggles bullet points for the currently selected lines.
         
         If a line starts with a bullet, it's removed. Otherwise, a bullet is added.
-        This operation is performed on all lines within the selection.
+        This operation is performed on all lines within the selection. Only the
+        bullet prefix of each line is inserted or deleted, so the rest of the text
+        and its formatting are left untouched.
         """
         BULLET_CHAR = " • "
         res = self.buffer.get_selection_bounds()
 
-        start, end = res if res else (
-            self.buffer.get_iter_at_mark(self.buffer.get_insert()),
-            self.buffer.get_iter_at_mark(self.buffer.get_insert())
-        )
-        if not res:
+        if res:
+            start, end = res
+        else:
+            start = self.buffer.get_iter_at_mark(self.buffer.get_insert())
             end = start.copy()
+        first_line, last_line = start.get_line(), end.get_line()
 
-        start.set_line_offset(0)
-        if not end.ends_line():
-            end.forward_to_line_end()
-
-        text = self.buffer.get_text(start, end, False)
-        lines = text.split('\n')
-
-        new_lines = [
-            line[len(BULLET_CHAR):] if line.startswith(BULLET_CHAR)
-            else f"{BULLET_CHAR}{line}" for line in lines
-        ]
-
+        # Suppress per-line `changed` handling; a single update is sent below.
+        self.buffer.handler_block_by_func(self._on_buffer_changed)
         self.buffer.begin_user_action()
-        self.buffer.delete(start, end)
-        self.buffer.insert(start, '\n'.join(new_lines))
-        self.buffer.end_user_action()
+        try:
+            for line in range(first_line, last_line + 1):
+                _, line_start = self.buffer.get_iter_at_line(line)
+                prefix_end = line_start.copy()
+                prefix_end.forward_chars(len(BULLET_CHAR))
+                if self.buffer.get_slice(line_start, prefix_end, False) == BULLET_CHAR:
+                    self.buffer.delete(line_start, prefix_end)
+                else:
+                    self.buffer.insert(line_start, BULLET_CHAR)
+        finally:
+            self.buffer.end_user_action()
+            self.buffer.handler_unblock_by_func(self._on_buffer_changed)
 
         self.text_view.grab_focus()
         self._on_buffer_changed(self.buffer)
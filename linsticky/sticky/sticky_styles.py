@@ -0,0 +1,149 @@
+"""
+Shared CSS Helpers for StickyWindow.
+
+This module collects the small styling helpers used by the sticky note mixins,
+keeping GTK version differences in one place.
+"""
+from gi.repository import Gtk, Gdk
+
+# Resolved once: whether this GTK provides `CssProvider.load_from_string` (4.12+).
+_HAS_LOAD_FROM_STRING = hasattr(Gtk.CssProvider, 'load_from_string')
+
+
+def load_css(provider: Gtk.CssProvider, css: str):
+    """
+    Loads a CSS string into the given provider.
+
+    Compatibility Note:
+    `Gtk.CssProvider.load_from_string` is available since GTK 4.12 and takes the
+    string directly. Older GTK4 releases only provide `load_from_data`, which
+    expects encoded bytes, so we fall back to it when needed.
+
+    Args:
+        provider: The CSS provider to (re)load.
+        css: The stylesheet source.
+    """
+    if _HAS_LOAD_FROM_STRING:
+        provider.load_from_string(css)
+    else:
+        provider.load_from_data(css.encode('utf-8'))
+
+
+# --- CSS Templates ---
+# Shared by all notes: the default Adw.Window background is made transparent
+# so our custom-colored `main_box` is visible.
+_WINDOW_CSS = "window.background.sticky-window { background-color: transparent; }"
+# Background rules for a note body and its main-window card carrying the
+# `note-color-<hex>` class.
+_NOTE_COLOR_CSS = (
+    ".sticky-main-area.{cls} {{ background-color: {color}; border-radius: 12px; }}\n"
+    ".sticky-paper-card.{cls} {{ background-color: {color}; }}"
+)
+# Background rule for the color swatch buttons in the note menus.
+_SWATCH_CSS = "button.{cls} {{ background-color: {color}; }}"
+# Shape rules shared by all swatches: round note colors, square text colors,
+# plus the ring marking the note's current color. Padding and theme minimum
+# sizes are cleared so each swatch is exactly its size request.
+_SWATCH_SHAPES_CSS = (
+    "button.sw-round, button.sw-square { padding: 0; min-width: 0; min-height: 0; } "
+    "button.sw-round { border-radius: 50%; } button.sw-square { border-radius: 3px; } "
+    "button.sw-outlined { border: 1px solid rgba(0,0,0,0.2); } "
+    "button.sw-current { outline: 2px solid alpha(currentColor, 0.6); outline-offset: 1px; }"
+)
+
+
+def _display_provider(priority: int) -> Gtk.CssProvider:
+    """
+    Creates a CSS provider and attaches it to the default display.
+
+    Args:
+        priority: The style provider priority to register it with.
+    """
+    provider = Gtk.CssProvider()
+    Gtk.StyleContext.add_provider_for_display(Gdk.Display.get_default(), provider, priority)
+    return provider
+
+
+# Display-wide provider holding the static window rule.
+_window_provider = None
+
+
+def ensure_window_css():
+    """Attaches the static sticky window stylesheet to the display once."""
+    global _window_provider
+    if _window_provider is None:
+        _window_provider = _display_provider(Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+        load_css(_window_provider, _WINDOW_CSS)
+
+
+# Display-wide provider holding one background rule per note color in use.
+_note_color_provider = None
+_note_color_classes = {}
+
+
+def ensure_note_color_class(color: str) -> str:
+    """
+    Returns the `note-color-*` class that paints a note body or card with the given color.
+
+    The rules for all note colors live in a single display provider, so
+    recoloring a note only swaps a CSS class. The provider is only reloaded
+    when a color that has not been seen before shows up.
+
+    Args:
+        color: The background color in hexadecimal format.
+    """
+    global _note_color_provider
+    color_class = _note_color_classes.get(color)
+    if color_class is not None:
+        return color_class
+
+    color_class = _note_color_classes[color] = f"note-color-{color.replace('#', '')}"
+    if _note_color_provider is None:
+        _note_color_provider = _display_provider(Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+    load_css(_note_color_provider, "\n".join(
+        _NOTE_COLOR_CSS.format(cls=cls, color=c) for c, cls in _note_color_classes.items()
+    ))
+    return color_class
+
+
+def swatch_class(color: str) -> str:
+    """
+    Returns the CSS class that paints a swatch button with the given color.
+
+    Args:
+        color: The swatch color in hexadecimal format.
+    """
+    return f"sw-color-{color.lstrip('#')}"
+
+
+# Display-wide provider holding one rule per registered swatch color.
+_swatch_provider = None
+_swatch_colors = set()
+
+
+def ensure_swatch_classes(colors):
+    """
+    Makes sure a `sw-color-*` class exists for every given color.
+
+    All swatch rules live in a single provider attached to the default display,
+    so the menus of every note only add CSS classes to their buttons instead of
+    creating and parsing a provider per button. The provider is only reloaded
+    when a color that has not been seen before shows up (e.g. after the palette
+    was edited in the settings).
+
+    Args:
+        colors: An iterable of hexadecimal colors.
+    """
+    global _swatch_provider
+    new_colors = [c for c in colors if c not in _swatch_colors]
+    if not new_colors:
+        return
+    _swatch_colors.update(new_colors)
+
+    if _swatch_provider is None:
+        _swatch_provider = _display_provider(Gtk.STYLE_PROVIDER_PRIORITY_USER)
+
+    rules = [_SWATCH_SHAPES_CSS]
+    for color in sorted(_swatch_colors):
+        rules.append(_SWATCH_CSS.format(cls=swatch_class(color), color=color))
+    load_css(_swatch_provider, "\n".join(rules))
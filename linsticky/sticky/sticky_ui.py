@@ -5,13 +5,63 @@ This module provides a mixin for `StickyWindow` that is responsible for
 building all the UI components of a single sticky note, such as the header,
 text area, menus, and resize handle.
 """
+import sys
+from functools import partial
+
 from gi.repository import Gtk, Gdk
 import builtins
 
+from .sticky_styles import ensure_swatch_classes, swatch_class
+
 # Ensure a fallback for gettext `_` is available.
 if not hasattr(builtins, "_"):
     builtins._ = lambda s: s
 
+# GtkBuilder templates for the text color grid, keyed by (button count, button size).
+_TEXT_COLOR_GRID_UI = {}
+
+
+def _text_color_grid_ui(count: int, btn_size: int) -> str:
+    """
+    Returns the GtkBuilder XML describing the text color swatch grid.
+
+    The XML only depends on the number of swatches and their size, so it is
+    generated once and reused by every sticky note.
+    """
+    key = (count, btn_size)
+    ui = _TEXT_COLOR_GRID_UI.get(key)
+    if ui is None:
+        buttons = "".join(
+            f"""
+    <child>
+      <object class="GtkButton" id="btn_{i}">
+        <property name="width-request">{btn_size}</property>
+        <property name="height-request">{btn_size}</property>
+        <style>
+          <class name="sw-square"/>
+        </style>
+        <layout>
+          <property name="column">{i % 4}</property>
+          <property name="row">{i // 4}</property>
+        </layout>
+      </object>
+    </child>"""
+            for i in range(count)
+        )
+        ui = f"""<interface>
+  <object class="GtkGrid" id="grid">
+    <property name="column-spacing">2</property>
+    <property name="row-spacing">2</property>
+    <property name="margin-top">4</property>
+    <property name="margin-bottom">4</property>
+    <property name="margin-start">4</property>
+    <property name="margin-end">4</property>{buttons}
+  </object>
+</interface>"""
+        _TEXT_COLOR_GRID_UI[key] = ui
+    return ui
+
+
 class StickyUI:
     """
     A mixin for `StickyWindow` that handles the construction of the UI.
@@ -20,7 +70,7 @@ class StickyUI:
     def setup_header(self):
         """Creates the compact header bar containing window controls."""
         self.header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
-        self.header_box.set_size_request(-1, int(22 * self.scale))
+        self.header_box.set_size_request(-1, self._s[22])
         self.header_box.add_css_class("compact-header")
 
         btn_add = Gtk.Button(label="+", has_frame=False)
@@ -33,15 +83,18 @@ class StickyUI:
         spacer.set_can_target(True)
         header_drag = Gtk.GestureDrag.new()
         header_drag.connect("drag-begin", self._on_header_drag_begin)
-        header_drag.connect("drag-update", self._on_header_drag_update)
+        # Position tracking is only needed on X11; elsewhere skip the
+        # per-motion Python dispatch entirely.
+        if self._is_x11:
+            header_drag.connect("drag-update", self._on_header_drag_update)
         header_drag.connect("drag-end", self._on_header_drag_end)
         spacer.add_controller(header_drag)
         self.header_box.append(spacer)
 
-        btn_menu = Gtk.MenuButton(has_frame=False, icon_name="open-menu-symbolic")
-        btn_menu.add_css_class("header-btn-subtle")
-        self.setup_main_menu(btn_menu)
-        self.header_box.append(btn_menu)
+        self._btn_menu = Gtk.MenuButton(has_frame=False, icon_name="open-menu-symbolic")
+        self._btn_menu.add_css_class("header-btn-subtle")
+        self.setup_main_menu(self._btn_menu)
+        self.header_box.append(self._btn_menu)
 
         btn_close = Gtk.Button(label="✕", has_frame=False)
         btn_close.add_css_class("header-btn-subtle")
@@ -50,12 +103,75 @@ class StickyUI:
 
         self.main_box.append(self.header_box)
 
+    def _fill_lazy_popover(self, btn: Gtk.MenuButton, build):
+        """
+        Builds a menu button's popover content the first time it is opened.
+
+        Args:
+            btn: The menu button whose popover is about to be shown.
+            build: Callable taking the popover and returning its child widget.
+        """
+        popover = btn.get_popover()
+        if popover.get_child() is None:
+            popover.set_child(build(popover))
+
+    def _on_popover_item_clicked(self, popover: Gtk.Popover, callback, arg, button: Gtk.Button):
+        """
+        Runs a popover item's action and closes the popover.
+
+        Args:
+            popover: The popover containing the clicked item.
+            callback: The action to run.
+            arg: The single argument passed to the action.
+            button: The clicked item.
+        """
+        callback(arg)
+        popover.popdown()
+
     def setup_main_menu(self, btn: Gtk.MenuButton):
         """
-        Constructs the main popover menu for note color and print actions.
+        Attaches the main popover menu for note color and print actions.
+
+        The menu content is only built when the user first opens it, using the
+        palette remembered here so `reload_config` can tell when it changed.
+        """
+        self._menu_palette = tuple(self.config.get("palette", []))
+        self._menu_swatches = {}
+        self._marked_color = None
+        btn.set_popover(Gtk.Popover())
+        btn.set_create_popup_func(self._on_main_menu_popup)
+
+    def _on_main_menu_popup(self, btn: Gtk.MenuButton):
+        """
+        Fills the main menu on first open and rings the note's current color.
+        The menu itself is reused; only the marked swatch changes between opens.
+
+        Args:
+            btn: The main menu button.
+        """
+        self._fill_lazy_popover(btn, self._build_main_menu)
+        color = self.current_color
+        if color == self._marked_color:
+            return
+        prev = self._menu_swatches.get(self._marked_color)
+        if prev is not None:
+            prev.remove_css_class("sw-current")
+        current = self._menu_swatches.get(color)
+        if current is not None:
+            current.add_css_class("sw-current")
+        self._marked_color = color
+
+    def _build_main_menu(self, popover: Gtk.Popover) -> Gtk.Widget:
+        """
+        Constructs the main menu content for the given popover.
+
+        Args:
+            popover: The popover the menu is shown in.
+
+        Returns:
+            The root widget of the menu.
         """
-        popover = Gtk.Popover()
-        main_vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=int(4 * self.scale))
+        main_vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=self._s[4])
         main_vbox.add_css_class("menu-box")
 
         lbl_color = Gtk.Label(label=builtins._("Color"), xalign=0)
@@ -63,16 +179,18 @@ class StickyUI:
         main_vbox.append(lbl_color)
 
         grid = Gtk.Grid(column_spacing=6, row_spacing=6)
-        btn_size = int(22 * self.scale)
-        
-        for i, color in enumerate(self.config.get("palette", [])):
+        btn_size = self._s[22]
+        palette = self.config.get("palette", [])
+        ensure_swatch_classes(palette)
+
+        for i, color in enumerate(palette):
             b = Gtk.Button()
             b.set_size_request(btn_size, btn_size)
-            # Apply color swatch style via a dedicated CSS provider for the button.
-            cp = Gtk.CssProvider()
-            cp.load_from_data(f"button {{ background-color: {color}; border-radius: 50%; }}".encode())
-            b.get_style_context().add_provider(cp, Gtk.STYLE_PROVIDER_PRIORITY_USER)
-            b.connect("clicked", lambda _, c=color: (self.apply_color(c), popover.popdown()))
+            # Color swatch styles come from the shared swatch classes.
+            b.add_css_class("sw-round")
+            b.add_css_class(swatch_class(color))
+            b.connect("clicked", partial(self._on_popover_item_clicked, popover, self.apply_color, color))
+            self._menu_swatches[color] = b
             grid.attach(b, i % 4, i // 4, 1, 1)
         main_vbox.append(grid)
 
@@ -85,7 +203,7 @@ class StickyUI:
         box_custom.append(Gtk.Label(label=builtins._("Customize")))
         btn_custom = Gtk.Button(child=box_custom, has_frame=False)
         btn_custom.add_css_class("menu-row-btn")
-        btn_custom.connect("clicked", lambda _: (self.on_customization_clicked(None), popover.popdown()))
+        btn_custom.connect("clicked", partial(self._on_popover_item_clicked, popover, self.on_customization_clicked, None))
         main_vbox.append(btn_custom)
 
         box_print = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
@@ -93,59 +211,118 @@ class StickyUI:
         box_print.append(Gtk.Label(label=builtins._("Print note")))
         btn_print = Gtk.Button(child=box_print, has_frame=False)
         btn_print.add_css_class("menu-row-btn")
-        btn_print.connect("clicked", lambda _: (self.on_print_clicked(None), popover.popdown()))
+        btn_print.connect("clicked", partial(self._on_popover_item_clicked, popover, self.on_print_clicked, None))
         main_vbox.append(btn_print)
 
-        popover.set_child(main_vbox)
-        btn.set_popover(popover)
+        return main_vbox
 
     def setup_text_color_popover(self, btn: Gtk.MenuButton):
-        """Creates the popover for selecting text color."""
-        popover = Gtk.Popover()
-        grid = Gtk.Grid(column_spacing=2, row_spacing=2, margin_top=4, margin_bottom=4, margin_start=4, margin_end=4)
-        btn_size = int(18 * self.scale)
-        
-        for i, color in enumerate(self.config.get("text_colors", [])):
-            b = Gtk.Button()
-            b.set_size_request(btn_size, btn_size)
-            cp = Gtk.CssProvider()
-            cp.load_from_data(f"button {{ background-color: {color}; border-radius: 3px; }}".encode())
-            b.get_style_context().add_provider(cp, Gtk.STYLE_PROVIDER_PRIORITY_USER)
-            b.connect("clicked", lambda _, c=color: (self.apply_text_color(c), popover.popdown()))
-            grid.attach(b, i % 4, i // 4, 1, 1)
+        """
+        Attaches the popover for selecting text color, built on first open.
+
+        The colors are remembered so `reload_config` can tell when they changed.
+        """
+        self._text_colors = tuple(self.config.get("text_colors", []))
+        btn.set_popover(Gtk.Popover())
+        btn.set_create_popup_func(self._fill_lazy_popover, self._build_text_color_grid)
+
+    def _build_text_color_grid(self, popover: Gtk.Popover) -> Gtk.Widget:
+        """
+        Constructs the text color swatch grid for the given popover.
+
+        Args:
+            popover: The popover the grid is shown in.
+
+        Returns:
+            The swatch grid widget.
+        """
+        colors = self.config.get("text_colors", [])
+        builder = Gtk.Builder.new_from_string(_text_color_grid_ui(len(colors), self._s[18]), -1)
+        grid = builder.get_object("grid")
+        ensure_swatch_classes(colors)
 
-        popover.set_child(grid)
-        btn.set_popover(popover)
+        for i, color in enumerate(colors):
+            b = builder.get_object(f"btn_{i}")
+            b.add_css_class(swatch_class(color))
+            b.connect("clicked", partial(self._on_popover_item_clicked, popover, self.apply_text_color, color))
+
+        return grid
 
     def setup_font_size_popover(self, btn: Gtk.MenuButton):
-        """Creates the popover for selecting font size."""
-        popover = Gtk.Popover()
+        """
+        Attaches the popover for selecting font size, built on first open.
+
+        The sizes are remembered so `reload_config` can tell when they changed.
+        """
+        self._font_sizes = tuple(self.config.get("font_sizes", []))
+        self._font_size_buttons = {}
+        self._marked_font_size = None
+        btn.set_popover(Gtk.Popover())
+        btn.set_create_popup_func(self._on_font_size_popup)
+
+    def _on_font_size_popup(self, btn: Gtk.MenuButton):
+        """
+        Fills the font size popover on first open and highlights the size at the cursor.
+        Only the previously highlighted button and the new one are touched.
+
+        Args:
+            btn: The font size menu button.
+        """
+        self._fill_lazy_popover(btn, self._build_font_size_list)
+        size = self._last_shown_font
+        if size == self._marked_font_size:
+            return
+        prev = self._font_size_buttons.get(self._marked_font_size)
+        if prev is not None:
+            prev.remove_css_class("accent")
+        current = self._font_size_buttons.get(size)
+        if current is not None:
+            current.add_css_class("accent")
+        self._marked_font_size = size
+
+    def _build_font_size_list(self, popover: Gtk.Popover) -> Gtk.Widget:
+        """
+        Constructs the scrollable font size list for the given popover.
+
+        Args:
+            popover: The popover the list is shown in.
+
+        Returns:
+            The scrolled window holding the size buttons.
+        """
         scrolled = Gtk.ScrolledWindow(max_content_height=200, propagate_natural_height=True)
         vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         
         for size in self.config.get("font_sizes", []):
             b = Gtk.Button(label=str(size), has_frame=False)
             b.add_css_class("format-btn-tiny")
-            b.connect("clicked", lambda _, s=size: (self.apply_font_size(s), popover.popdown()))
+            b.connect("clicked", partial(self._on_popover_item_clicked, popover, self.apply_font_size, size))
+            self._font_size_buttons[size] = b
             vbox.append(b)
             
         scrolled.set_child(vbox)
-        popover.set_child(scrolled)
-        btn.set_popover(popover)
+        return scrolled
 
     def apply_color(self, hex_color: str):
         """
         Applies a new background color to the note and updates the live preview card.
         """
-        self.current_color = hex_color
+        # Interned so the many notes sharing a color also share the key string
+        # used by the CSS cache and the unchanged-color check.
+        self.current_color = sys.intern(hex_color)
         self._update_ui_design()
-        if self.main_window:
-            self.main_window.update_card_color_live(self.note_id, hex_color)
+        # While loading, the color comes from the same row the card was built
+        # from, so only user changes are pushed to the main window.
+        if not self._loading:
+            self._dirty = True
+            self._schedule_save()
+            if self.main_window:
+                self.main_window.update_card_color_live(self.note_id, hex_color)
 
     def setup_resize_handle(self):
         """Adds a draggable resize handle to the bottom-right corner."""
         self.resize_handle = Gtk.Box()
-        size = int(16 * self.scale)
+        size = self._s[16]
         self.resize_handle.set_size_request(size, size)
         self.resize_handle.set_halign(Gtk.Align.END)
         self.resize_handle.set_valign(Gtk.Align.END)
@@ -162,7 +339,6 @@ class StickyUI:
         self.text_view = Gtk.TextView(wrap_mode=Gtk.WrapMode.WORD_CHAR)
         self.text_view.add_css_class("sticky-text-edit")
         self.buffer = self.text_view.get_buffer()
-        self.buffer.connect("changed", self._on_buffer_changed)
 
         # Attach the key controller directly to the text view.
         key_ctrl = Gtk.EventControllerKey.new()
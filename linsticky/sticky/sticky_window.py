@@ -5,13 +5,26 @@ This module defines the `StickyWindow` class, which is the core component for
 displaying and interacting with a single note. It integrates multiple mixins
 for handling UI, events, actions, and text formatting to keep the code modular.
 """
-import gi
+import functools
+import sys
+
 from gi.repository import Gtk, Gdk, GLib, Adw
 
 from .sticky_formatting import StickyFormatting
 from .sticky_actions import StickyActions
 from .sticky_ui import StickyUI
 from .sticky_events import StickyEvents
+from .sticky_styles import ensure_note_color_class, ensure_window_css
+
+
+@functools.lru_cache(maxsize=1)
+def is_x11() -> bool:
+    """
+    Returns True when the default display uses the X11 backend.
+
+    The backend cannot change at runtime, so it is detected once per process.
+    """
+    return "X11" in type(Gdk.Display.get_default()).__name__
 
 
 class StickyWindow(Adw.Window, StickyFormatting, StickyActions, StickyUI, StickyEvents):
@@ -23,6 +36,18 @@ class StickyWindow(Adw.Window, StickyFormatting, StickyActions, StickyUI, Sticky
     look and feel in both DEB and Snap packages. It combines functionality from
     various mixins to manage its behavior.
     """
+    # Formatting bar buttons: (config key, label markup, handler method, argument).
+    _FORMAT_BUTTONS = (
+        ("bold", "<b>B</b>", "apply_format", "bold"),
+        ("italic", "<i>I</i>", "apply_format", "italic"),
+        ("underline", "<u>U</u>", "apply_format", "underline"),
+        ("strikethrough", "<s>S</s>", "apply_format", "strikethrough"),
+        ("list", "≡", "toggle_bullet_list", None),
+    )
+    # Keys of the "formatting" config section, in the order of `_fmt_flags`:
+    # the formatting buttons above, then the color and font size menus.
+    _FORMAT_FLAG_KEYS = tuple(key for key, *_ in _FORMAT_BUTTONS) + ("text_color", "font_size")
+
     def __init__(self, db, note_id=None, main_window=None):
         """
         Initializes the sticky note window.
@@ -41,11 +66,32 @@ class StickyWindow(Adw.Window, StickyFormatting, StickyActions, StickyUI, Sticky
         self.config = getattr(main_window, 'config', {})
         self._loading = True
         self._is_destroying = False
+        self._dirty = False
+        self._text_dirty = False
+        self._last_content = None
+        self._saved_state = None
+        self._saved_geometry = None
+        self._geom_dirty = False
+        self._dirty_source = 0
+        self._save_pending_id = 0
+        self._configure_source = 0
+        self._cursor_source = 0
+        self._load_source_id = 0
         self.scale = 1.0
+        # Scaled pixel sizes used by the UI builders, keyed by their 1.0 value.
+        self._s = {n: int(n * self.scale) for n in (3, 4, 16, 18, 22)}
         self.current_color = "#FFF59D"
         self.default_font_size = 12
+        self._last_shown_font = None
+        self._font_sizes_used = False
+        self._fmt_flags = None
+        # Design updates are deferred until the stored color has been applied.
+        self._defer_design = True
+        self._pending_design = False
+        self._is_x11 = is_x11()
         
         # --- Load Geometry ---
+        note_data = None
         if self.note_id:
             note_data = self.db.get(self.note_id)
             if note_data:
@@ -76,16 +122,16 @@ class StickyWindow(Adw.Window, StickyFormatting, StickyActions, StickyUI, Sticky
         self.setup_resize_handle()
 
         # --- Data Loading and Signal Connection ---
-        self.load_from_db()
-        self._loading = False
+        self.load_from_db(prefetched=note_data)
+        self._defer_design = False
+        if self._pending_design:
+            self._update_ui_design()
         self._connect_main_signals()
 
         # --- Event and Persistence Controllers ---
         focus_ctrl = Gtk.EventControllerFocus()
         focus_ctrl.connect("leave", lambda *_: self.save())
         self.add_controller(focus_ctrl)
-        
-        self.save_timer_id = GLib.timeout_add_seconds(2, self.save)
 
     def apply_styles(self):
         """
@@ -96,17 +142,15 @@ class StickyWindow(Adw.Window, StickyFormatting, StickyActions, StickyUI, Sticky
         way to apply custom styles that work consistently across different themes
         and packaging formats (DEB/Snap). It ensures our styles have high enough
         priority to override defaults provided by Adwaita.
+
+        The static window rule is identical for every note, so it is parsed once
+        into a single display provider. Note colors are shared display-wide as
+        well (see `_update_ui_design`), so a window owns no CSS provider of its own.
         """
-        css_provider = Gtk.CssProvider()
-        # This CSS makes the default Adw.Window background transparent,
-        # allowing our custom-colored `main_box` to be visible.
-        css = "window.background.sticky-window { background-color: transparent; }"
-        css_provider.load_from_data(css.encode('utf-8'))
-        Gtk.StyleContext.add_provider_for_display(
-            Gdk.Display.get_default(),
-            css_provider,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-        )
+        ensure_window_css()
+
+        self._applied_color = None
+        self._color_class = None
         self.add_css_class("sticky-window")
         self._update_ui_design()
 
@@ -114,134 +158,214 @@ class StickyWindow(Adw.Window, StickyFormatting, StickyActions, StickyUI, Sticky
         """Connects core signals for the window and its text buffer."""
         self.connect("close-request", self._on_close_requested)
         self.connect("map", self._on_map)
+        self.connect("unmap", self._on_unmap)
         self.connect("notify::default-width", self._on_configure_event)
         self.connect("notify::default-height", self._on_configure_event)
         self.buffer.connect("notify::cursor-position", self.on_cursor_moved)
+        self._apply_tag_handler = self.buffer.connect("apply-tag", self._on_tag_applied)
         self.buffer.connect("changed", self._on_buffer_changed)
 
     def _on_configure_event(self, *args):
-        """Updates the internal state with the new window dimensions for saving."""
-        self.saved_width = self.get_default_size()[0]
-        self.saved_height = self.get_default_size()[1]
+        """
+        Schedules a geometry update after the window's default size changed.
+
+        A resize notifies both `default-width` and `default-height`; the two
+        notifications are coalesced into a single idle update.
+        """
+        if not self._configure_source:
+            self._configure_source = GLib.idle_add(self._flush_configure)
+
+    def _flush_configure(self) -> bool:
+        """
+        Updates the internal state with the new window dimensions for saving.
+
+        The geometry is only flagged for saving when the size really differs
+        from the last known one, so re-applying the saved size on map does not
+        cause a redundant database write.
+
+        Returns:
+            False to remove the idle source.
+        """
+        self._configure_source = 0
+        width, height = self.get_default_size()
+        if (width, height) != (self.saved_width, self.saved_height):
+            self.saved_width, self.saved_height = width, height
+            self._geom_dirty = True
+            self._schedule_save()
+        return False
 
     def _update_ui_design(self, hex_color=None):
         """
         Updates the background color of the note.
         
-        This method dynamically creates a CSS class for the specified color
-        and applies it to the main content box of the note.
+        This method applies a `note-color-*` CSS class for the specified color
+        to the main content box of the note. The rules for all colors are shared
+        by every note, so only a color never seen before causes a CSS reload.
+
+        While the window is being constructed the update is only recorded, so
+        the stored color is applied once it is known.
         """
         if hex_color:
-            self.current_color = hex_color.strip()
-        
+            self.current_color = sys.intern(hex_color.strip())
+        if self._defer_design:
+            self._pending_design = True
+            return
+
         bg_color = self.current_color or "#FFF59D"
-        
-        # Remove any previously applied color classes to avoid conflicts.
-        for c in self.main_box.get_css_classes():
-            if c.startswith("note-color-"):
-                self.main_box.remove_css_class(c)
-        
-        color_class = f'note-color-{bg_color.replace("#", "")}'
+        if bg_color == self._applied_color:
+            return
+        self._applied_color = bg_color
+
+        # Swap the previously applied color class for the new one; the rule
+        # behind it lives in the shared note color provider.
+        if self._color_class:
+            self.main_box.remove_css_class(self._color_class)
+        color_class = ensure_note_color_class(bg_color)
         self.main_box.add_css_class(color_class)
-        
-        style_provider = Gtk.CssProvider()
-        style_provider.load_from_data(f"""
-        .sticky-main-area.{color_class} {{
-            background-color: {bg_color};
-            border-radius: 12px;
-        }}
-        """.encode('utf-8'))
-        
-        Gtk.StyleContext.add_provider_for_display(
-            Gdk.Display.get_default(),
-            style_provider,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-        )
+        self._color_class = color_class
 
     def setup_formatting_bar(self):
-        """Constructs or reconstructs the bottom text formatting toolbar."""
-        if hasattr(self, 'format_bar') and self.format_bar.get_parent():
-            self.main_box.remove(self.format_bar)
+        """
+        Constructs the bottom text formatting toolbar, or updates it on later calls.
+
+        The buttons are created once; subsequent calls (e.g. from `reload_config`)
+        only toggle their visibility according to the formatting configuration.
+        """
+        if not hasattr(self, 'format_bar'):
+            self._build_formatting_bar()
 
+        fmt_config = self.config.get("formatting") or {}
+        if not isinstance(fmt_config, dict): fmt_config = {}
+        flags = tuple(bool(fmt_config.get(key, True)) for key in self._FORMAT_FLAG_KEYS)
+        if flags == self._fmt_flags:
+            return
+        self._fmt_flags = flags
+
+        *button_flags, show_color, show_font = flags
+        for btn, visible in zip(self._fmt_buttons.values(), button_flags):
+            btn.set_visible(visible)
+
+        self._fmt_sep.set_visible(any(button_flags) and (show_color or show_font))
+        self._fmt_color_btn.set_visible(show_color)
+        self.btn_font_size.set_visible(show_font)
+
+    def _build_formatting_bar(self):
+        """Creates the formatting toolbar and all of its buttons."""
         self.format_bar = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
         self.format_bar.add_css_class("compact-format-bar")
         self.main_box.append(self.format_bar)
 
-        scale = self.scale
-        icon_size = int(18 * scale)
-        fmt_config = self.config.get("formatting", {})
-        if not isinstance(fmt_config, dict): fmt_config = {}
+        icon_size = self._s[18]
 
-        buttons_config = [
-            ("bold", "<b>B</b>", self.apply_format, "bold"),
-            ("italic", "<i>I</i>", self.apply_format, "italic"),
-            ("underline", "<u>U</u>", self.apply_format, "underline"),
-            ("strikethrough", "<s>S</s>", self.apply_format, "strikethrough"),
-            ("list", "≡", self.toggle_bullet_list, None)
-        ]
-
-        has_any_btn = False
-        for key, label, callback, arg in buttons_config:
-            if fmt_config.get(key, True):
-                btn = Gtk.Button(has_frame=False)
-                btn.set_child(Gtk.Label(label=label, use_markup=True))
-                btn.add_css_class("format-btn-tiny")
-                btn.set_size_request(icon_size, icon_size)
-                if arg:
-                    btn.connect("clicked", (lambda cb, a: lambda _: cb(a))(callback, arg))
-                else:
-                    btn.connect("clicked", (lambda cb: lambda _: cb())(callback))
-                self.format_bar.append(btn)
-                has_any_btn = True
-
-        show_color = fmt_config.get("text_color", True)
-        show_font = fmt_config.get("font_size", True)
-
-        if has_any_btn and (show_color or show_font):
-            sep = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL, margin_start=int(3*scale), margin_end=int(3*scale))
-            self.format_bar.append(sep)
-
-        if show_color:
-            btn_text_color = Gtk.MenuButton(has_frame=False)
-            btn_text_color.set_child(Gtk.Label(label='<span foreground="#444">A</span>', use_markup=True))
-            btn_text_color.add_css_class("format-btn-tiny")
-            btn_text_color.set_size_request(icon_size, icon_size)
-            self.setup_text_color_popover(btn_text_color)
-            self.format_bar.append(btn_text_color)
-
-        if show_font:
-            self.btn_font_size = Gtk.MenuButton(label=str(self.default_font_size), has_frame=False)
-            self.btn_font_size.add_css_class("format-btn-tiny")
-            self.btn_font_size.set_size_request(int(icon_size * 1.5), icon_size)
-            self.setup_font_size_popover(self.btn_font_size)
-            self.format_bar.append(self.btn_font_size)
+        self._fmt_buttons = {}
+        for key, label, method_name, arg in self._FORMAT_BUTTONS:
+            btn = Gtk.Button(has_frame=False)
+            btn.set_child(Gtk.Label(label=label, use_markup=True))
+            btn.add_css_class("format-btn-tiny")
+            btn.set_size_request(icon_size, icon_size)
+            btn.connect("clicked", functools.partial(self._on_format_button_clicked, getattr(self, method_name), arg))
+            self.format_bar.append(btn)
+            self._fmt_buttons[key] = btn
+
+        self._fmt_sep = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL, margin_start=self._s[3], margin_end=self._s[3])
+        self.format_bar.append(self._fmt_sep)
+
+        self._fmt_color_btn = Gtk.MenuButton(has_frame=False)
+        self._fmt_color_btn.set_child(Gtk.Label(label='<span foreground="#444">A</span>', use_markup=True))
+        self._fmt_color_btn.add_css_class("format-btn-tiny")
+        self._fmt_color_btn.set_size_request(icon_size, icon_size)
+        self.setup_text_color_popover(self._fmt_color_btn)
+        self.format_bar.append(self._fmt_color_btn)
+
+        self.btn_font_size = Gtk.MenuButton(label=str(self.default_font_size), has_frame=False)
+        self._last_shown_font = self.default_font_size
+        self.btn_font_size.add_css_class("format-btn-tiny")
+        self.btn_font_size.set_size_request(int(icon_size * 1.5), icon_size)
+        self.setup_font_size_popover(self.btn_font_size)
+        self.format_bar.append(self.btn_font_size)
+
+    def _on_format_button_clicked(self, callback, arg, button: Gtk.Button):
+        """
+        Dispatches a formatting bar click to its handler.
+
+        Args:
+            callback: The formatting method bound to the button.
+            arg: The argument for the method, or None if it takes none.
+            button: The clicked button.
+        """
+        if arg is None:
+            callback()
+        else:
+            callback(arg)
 
     def on_cursor_moved(self, buffer, pspec):
-        """Updates the font size indicator in the UI based on the cursor's position."""
-        if not hasattr(self, 'btn_font_size'):
+        """
+        Schedules an update of the font size indicator after the cursor moved.
+
+        Bulk edits (paste, undo) move the cursor several times per main-loop
+        iteration; those notifications collapse into a single idle update.
+        No update is scheduled at all while the indicator already shows the
+        default size and no font size tag is in use, since it cannot change.
+        """
+        if not self._font_sizes_used and self._last_shown_font == self.default_font_size:
             return
-        cursor_iter = buffer.get_iter_at_mark(buffer.get_insert())
-        tags = cursor_iter.get_tags()
+        if not self._cursor_source:
+            self._cursor_source = GLib.idle_add(self._flush_cursor)
+
+    def _flush_cursor(self) -> bool:
+        """
+        Updates the font size indicator in the UI based on the cursor's position.
+
+        The cursor handler is connected after the formatting bar is built, so
+        the indicator always exists; the label is only touched when the size at
+        the cursor actually differs from the one already shown. As long as no
+        font size tag was ever applied, the cursor's tags are not inspected.
+
+        Returns:
+            False to remove the idle source.
+        """
+        self._cursor_source = 0
         current_size = self.default_font_size
-        for tag in tags:
-            name = tag.get_property("name")
-            if name and name.startswith("font_size_"):
-                try:
-                    current_size = int(name.replace("font_size_", ""))
-                except ValueError:
-                    pass
-        self.btn_font_size.set_label(str(current_size))
+        if self._font_sizes_used:
+            buffer = self.buffer
+            tags = buffer.get_iter_at_mark(buffer.get_insert()).get_tags()
+            if tags:
+                tag_to_font_size = self._tag_to_font_size
+                for tag in tags:
+                    if tag in tag_to_font_size:
+                        current_size = tag_to_font_size[tag]
+        if current_size != self._last_shown_font:
+            self._last_shown_font = current_size
+            self.btn_font_size.set_label(str(current_size))
+        return False
+
+    def _on_tag_applied(self, buffer, tag, start, end):
+        """
+        Records that a font size tag is present in the buffer.
+
+        The handler disconnects itself once a font size tag shows up, since the
+        flag is never cleared again.
+        """
+        if tag in self._tag_to_font_size:
+            self._font_sizes_used = True
+            buffer.disconnect(self._apply_tag_handler)
 
     def reload_config(self, new_config: dict):
         """
-        Reloads the window's configuration and rebuilds UI components accordingly.
+        Reloads the window's configuration and updates UI components accordingly.
+
+        Existing widgets are kept: the main menu and the text color and font
+        size popovers are only reset (to be rebuilt lazily) when their entries
+        changed, and the formatting bar only toggles the visibility of its buttons.
 
         Args:
             new_config: The new configuration dictionary.
         """
         self.config = new_config
-        if hasattr(self, 'header_box'):
-            self.main_box.remove(self.header_box)
-        self.setup_header()
-        self.main_box.reorder_child_after(self.header_box, None)
+        if tuple(new_config.get("palette", [])) != self._menu_palette:
+            self.setup_main_menu(self._btn_menu)
+        if tuple(new_config.get("text_colors", [])) != self._text_colors:
+            self.setup_text_color_popover(self._fmt_color_btn)
+        if tuple(new_config.get("font_sizes", [])) != self._font_sizes:
+            self.setup_font_size_popover(self.btn_font_size)
         self.setup_formatting_bar()
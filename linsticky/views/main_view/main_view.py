@@ -2,6 +2,7 @@ import builtins
 from gi.repository import Gtk, Adw, Gio, Gdk, GLib
 from views.main_view.note_card import NoteCard
 from sticky.sticky_window import StickyWindow
+from sticky.sticky_styles import ensure_swatch_classes, load_css, swatch_class
 from views.settings_view import SettingsView
 from views.trash_view import TrashView
 
@@ -28,6 +29,11 @@ class MainWindow(Adw.ApplicationWindow):
         self.db = db
         self.config = application.config
         self.stickies = {}
+        self._cards = {}
+        self._card_menu = None
+        self._card_menu_palette = None
+        self._card_menu_note_id = None
+        self._stale_cards = set()
 
         css_provider = Gtk.CssProvider()
         css = """
@@ -35,7 +41,7 @@ class MainWindow(Adw.ApplicationWindow):
                 flowboxchild { padding: 0px; margin: 0px; border: none; min-width: 0px; outline: none; }
                 window.background { background-color: #ffffff; } 
                 """
-        css_provider.load_from_data(css.encode())
+        load_css(css_provider, css)
         Gtk.StyleContext.add_provider_for_display(Gdk.Display.get_default(), css_provider,
                                                   Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
 
@@ -80,6 +86,7 @@ class MainWindow(Adw.ApplicationWindow):
             valign=Gtk.Align.START,
             selection_mode=Gtk.SelectionMode.NONE
         )
+        self.flowbox.set_sort_func(self._sort_cards)
 
         scrolled = Gtk.ScrolledWindow(child=self.flowbox, vexpand=True)
         scrolled.set_has_frame(False)
@@ -98,6 +105,7 @@ class MainWindow(Adw.ApplicationWindow):
 
         self.stack.set_visible_child_name("main")
         self.refresh_list()
+        self.connect("map", self._on_map)
 
     def on_settings_changed(self):
         """
@@ -142,8 +150,11 @@ class MainWindow(Adw.ApplicationWindow):
 
     def refresh_list(self):
         """Refreshes the list of notes displayed in the flowbox."""
+        # The shared card menu must not stay attached to a card that is destroyed below.
+        self._release_card_menu()
         while child := self.flowbox.get_first_child():
             self.flowbox.remove(child)
+        self._cards.clear()
 
         self.flowbox.set_homogeneous(False)
         self.flowbox.set_max_children_per_line(1)
@@ -162,8 +173,9 @@ class MainWindow(Adw.ApplicationWindow):
 
         notes = self.db.all_notes(full=True)
         for note in notes:
-            card = NoteCard(note, self.db, refresh_callback=self.refresh_list)
+            card = NoteCard(note, self.db, refresh_callback=self.flowbox.invalidate_sort)
             self.flowbox.append(card)
+            self._cards[card.note_id] = card
 
             flow_child = card.get_parent()
             if flow_child:
@@ -176,6 +188,22 @@ class MainWindow(Adw.ApplicationWindow):
                 flow_child.set_hexpand(True)
                 flow_child.set_halign(Gtk.Align.FILL)
 
+    @staticmethod
+    def _sort_cards(child_a: Gtk.FlowBoxChild, child_b: Gtk.FlowBoxChild) -> int:
+        """
+        Orders note cards like the database listing: pinned first, newest first.
+        Pinning a card only re-sorts the list instead of rebuilding it.
+        Args:
+            child_a (Gtk.FlowBoxChild): The first card's flow box child.
+            child_b (Gtk.FlowBoxChild): The second card's flow box child.
+        Returns:
+            int: A negative, zero or positive value, as for a comparison.
+        """
+        a, b = child_a.get_child(), child_b.get_child()
+        if a.is_pinned != b.is_pinned:
+            return -1 if a.is_pinned else 1
+        return b.note_id - a.note_id
+
     def create_note(self):
         """Creates a new sticky note and opens it."""
         palette = self.config.get("palette", [])
@@ -236,14 +264,37 @@ class MainWindow(Adw.ApplicationWindow):
             note_id (int): The ID of the note card to update.
             serialized_content (list[dict]): The new serialized content for the note.
         """
-        child = self.flowbox.get_first_child()
-        while child:
-            card = child.get_child()
-            if isinstance(card, NoteCard) and card.note_id == note_id:
-                new_markup = card._generate_markup(serialized_content)
-                card.label.set_markup(new_markup)
-                break
-            child = child.get_next_sibling()
+        card = self._cards.get(note_id)
+        if card is not None:
+            card.label.set_markup(card._generate_markup(serialized_content))
+
+    def mark_card_stale(self, note_id: int):
+        """
+        Records that a note changed while this window was hidden.
+        Previews are not rendered for a window nobody sees; the card is
+        brought up to date when the window is shown again.
+        Args:
+            note_id (int): The ID of the note whose card is out of date.
+        """
+        self._stale_cards.add(note_id)
+
+    def _on_map(self, widget: Gtk.Widget):
+        """
+        Refreshes the cards of notes that changed while the window was hidden.
+        Open notes push their live buffer; closed ones are re-read from the database.
+        Args:
+            widget (Gtk.Widget): The main window.
+        """
+        stale, self._stale_cards = self._stale_cards, set()
+        for note_id in stale:
+            sticky = self.stickies.get(note_id)
+            if sticky is not None:
+                sticky.refresh_preview()
+                continue
+            card = self._cards.get(note_id)
+            row = self.db.get(note_id) if card is not None else None
+            if row is not None:
+                card.label.set_markup(card._preview_markup(row["content"] or ""))
 
     def update_card_color_live(self, note_id: int, color: str):
         """
@@ -252,13 +303,9 @@ class MainWindow(Adw.ApplicationWindow):
             note_id (int): The ID of the note card to update.
             color (str): The new color for the card.
         """
-        child = self.flowbox.get_first_child()
-        while child:
-            card = child.get_child()
-            if isinstance(card, NoteCard) and card.note_id == note_id:
-                card.update_color(color)
-                break
-            child = child.get_next_sibling()
+        card = self._cards.get(note_id)
+        if card is not None:
+            card.update_color(color)
 
     def on_action_delete_manual(self, note_id: int):
         """
@@ -278,11 +325,37 @@ class MainWindow(Adw.ApplicationWindow):
 
     def create_combined_context_menu(self, note_id: int, target_widget: Gtk.Widget):
         """
-        Creates and displays a context menu for a note card.
+        Displays the context menu for a note card.
+        The menu is built once and reused for every card; it is only rebuilt
+        when the palette changed. Each time it is shown it is re-attached to
+        the clicked card and remembers which note it acts on.
         Args:
             note_id (int): The ID of the note.
             target_widget (Gtk.Widget): The widget to attach the popover to.
         """
+        palette = tuple(self.config.get("palette", []))
+        if self._card_menu is None or palette != self._card_menu_palette:
+            if self._card_menu is not None and self._card_menu.get_parent():
+                self._card_menu.unparent()
+            self._card_menu = self._build_card_context_menu(palette)
+            self._card_menu_palette = palette
+
+        popover = self._card_menu
+        self._card_menu_note_id = note_id
+        if popover.get_parent() is not target_widget:
+            if popover.get_parent():
+                popover.unparent()
+            popover.set_parent(target_widget)
+        popover.popup()
+
+    def _build_card_context_menu(self, palette: tuple) -> Gtk.Popover:
+        """
+        Builds the note card context menu with color swatches and a delete action.
+        Args:
+            palette (tuple): The colors offered in the menu.
+        Returns:
+            Gtk.Popover: The menu popover, not yet attached to a card.
+        """
         popover = Gtk.Popover()
         vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
 
@@ -292,29 +365,62 @@ class MainWindow(Adw.ApplicationWindow):
         vbox.set_margin_end(8)
 
         grid = Gtk.Grid(column_spacing=8, row_spacing=8, halign=Gtk.Align.CENTER)
-        
-        palette = self.config.get("palette", [])
-        
+        ensure_swatch_classes(palette)
+
         for i, color in enumerate(palette):
             b = Gtk.Button()
             b.set_size_request(28, 28)
-            cp = Gtk.CssProvider()
-            cp.load_from_data(
-                f"button {{ background-color: {color}; border-radius: 14px; min-width: 28px; min-height: 28px; padding: 0; }}".encode())
-            b.get_style_context().add_provider(cp, Gtk.STYLE_PROVIDER_PRIORITY_USER)
-            b.connect("clicked", lambda _, c=color: self.update_note_color(note_id, c, target_widget, popover))
+            b.add_css_class("sw-round")
+            b.add_css_class(swatch_class(color))
+            b.connect("clicked", self._on_card_menu_color_clicked, color)
             grid.attach(b, i % 4, i // 4, 1, 1)
 
         vbox.append(grid)
         vbox.append(Gtk.Separator())
 
         btn_del = Gtk.Button(label=_("Move to Trash"), has_frame=False)
-        btn_del.connect("clicked", lambda _: (self.on_action_delete_manual(note_id), popover.popdown()))
+        btn_del.connect("clicked", self._on_card_menu_delete_clicked)
         vbox.append(btn_del)
 
         popover.set_child(vbox)
-        popover.set_parent(target_widget)
-        popover.popup()
+        popover.connect("closed", self._on_card_menu_closed)
+        return popover
+
+    def _on_card_menu_closed(self, popover: Gtk.Popover):
+        """
+        Detaches the shared card menu from its card once it is closed.
+        Args:
+            popover (Gtk.Popover): The card context menu.
+        """
+        self._release_card_menu()
+
+    def _release_card_menu(self):
+        """Closes the shared card menu and detaches it from the card it was shown on."""
+        popover = self._card_menu
+        if popover is None or popover.get_parent() is None:
+            return
+        popover.popdown()
+        # Popping down emits "closed", whose handler may already have detached it.
+        if popover.get_parent() is not None:
+            popover.unparent()
+
+    def _on_card_menu_color_clicked(self, btn: Gtk.Button, color: str):
+        """
+        Callback for a color swatch in the note card context menu.
+        Args:
+            btn (Gtk.Button): The clicked swatch.
+            color (str): The color of the swatch.
+        """
+        self.update_note_color(self._card_menu_note_id, color, btn, self._card_menu)
+
+    def _on_card_menu_delete_clicked(self, btn: Gtk.Button):
+        """
+        Callback for the 'Move to Trash' item in the note card context menu.
+        Args:
+            btn (Gtk.Button): The clicked menu item.
+        """
+        self._card_menu.popdown()
+        self.on_action_delete_manual(self._card_menu_note_id)
 
     def update_note_color(self, note_id: int, color: str, widget: Gtk.Widget, popover: Gtk.Popover):
         """
@@ -325,7 +431,7 @@ class MainWindow(Adw.ApplicationWindow):
             widget (Gtk.Widget): The widget that triggered the color change (e.g., a color button).
             popover (Gtk.Popover): The popover containing the color selection.
         """
+        popover.popdown()
         self.db.update_color(note_id, color)
         self.refresh_list()
         if note_id in self.stickies: self.stickies[note_id].apply_color(color)
-        popover.popdown()
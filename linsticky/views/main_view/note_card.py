@@ -1,10 +1,73 @@
-import json
 import html as html_lib
-from gi.repository import Gtk, Pango
+from gi.repository import Gtk, Gdk, Pango
 import builtins
+from sticky.sticky_actions import decode_note_content
+from sticky.sticky_styles import ensure_note_color_class, load_css
 
 _ = builtins._
 
+# Color-independent card rules, loaded once into a display-wide provider.
+_CARD_BASE_CSS = ".sticky-paper-card { border-radius: 0px; min-height: 50px; }"
+_card_base_provider = None
+
+
+def _ensure_card_base_css():
+    """Attaches the shared, color-independent card stylesheet to the display once."""
+    global _card_base_provider
+    if _card_base_provider is None:
+        _card_base_provider = Gtk.CssProvider()
+        load_css(_card_base_provider, _CARD_BASE_CSS)
+        Gtk.StyleContext.add_provider_for_display(
+            Gdk.Display.get_default(),
+            _card_base_provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_USER
+        )
+
+
+# Preview markup per note id, as (stored content, markup) pairs.
+_PREVIEW_CACHE = {}
+
+
+def forget_preview(*note_ids: int):
+    """
+    Drops the cached preview markup of permanently deleted notes.
+    Args:
+        *note_ids (int): The IDs of the deleted notes.
+    """
+    for note_id in note_ids:
+        _PREVIEW_CACHE.pop(note_id, None)
+
+
+# Pango markup per buffer tag name, as (opening, closing) pairs. The dynamic
+# color and size tags are parsed on first sight and cached here as well.
+_TAG_MARKUP = {
+    "bold": ("<b>", "</b>"),
+    "italic": ("<i>", "</i>"),
+    "underline": ("<u>", "</u>"),
+    "strikethrough": ("<s>", "</s>"),
+}
+
+
+def _tag_markup(tag: str) -> tuple[str, str]:
+    """
+    Returns the Pango markup pair that renders a buffer tag.
+    Args:
+        tag (str): The tag name, e.g. "bold" or "font_size_14".
+    Returns:
+        tuple[str, str]: The opening and closing markup; empty for unknown tags.
+    """
+    markup = _TAG_MARKUP.get(tag)
+    if markup is None:
+        if tag[:11] == "text_color_":
+            markup = (f'<span foreground="{tag[11:]}">', "</span>")
+        elif tag[:10] == "font_size_":
+            markup = (f'<span size="{tag[10:]}pt">', "</span>")
+        else:
+            markup = ("", "")
+        _TAG_MARKUP[tag] = markup
+    return markup
+
+
 class NoteCard(Gtk.Box):
     """
     A custom Gtk.Box widget representing a single sticky note card in the main window.
@@ -35,6 +98,11 @@ class NoteCard(Gtk.Box):
         self.card_canvas.set_overflow(Gtk.Overflow.HIDDEN)
         self.append(self.card_canvas)
 
+        # The background color comes from the shared note color classes, so
+        # cards need no stylesheet of their own.
+        _ensure_card_base_css()
+        self._color_class = None
+
         header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
         header.set_margin_top(4); header.set_margin_end(4)
         self.card_canvas.append(header)
@@ -48,17 +116,7 @@ class NoteCard(Gtk.Box):
         self._update_pin_icon()
         header.append(self.pin_button)
         
-        initial_content_raw = note["content"] or ""
-        segments = []
-        try:
-            segments = json.loads(bytes.fromhex(initial_content_raw).decode('utf-8'))
-        except (ValueError, TypeError, json.JSONDecodeError):
-            try:
-                segments = json.loads(initial_content_raw)
-            except (ValueError, TypeError, json.JSONDecodeError):
-                segments = [{"text": initial_content_raw, "tags": []}]
-
-        markup_text = self._generate_markup(segments)
+        markup_text = self._preview_markup(note["content"] or "")
 
         self.label = Gtk.Label()
         self.label.set_use_markup(True)
@@ -99,6 +157,29 @@ class NoteCard(Gtk.Box):
             self.refresh_callback()
         gesture.set_state(Gtk.EventSequenceState.CLAIMED)
 
+    def _preview_markup(self, raw_content: str) -> str:
+        """
+        Returns the preview markup for the stored note content.
+        The list is rebuilt on every refresh, so the markup is remembered per
+        note and only regenerated when the stored content changed.
+        Args:
+            raw_content (str): The content column of the note.
+        Returns:
+            str: The Pango markup for the card preview.
+        """
+        cached = _PREVIEW_CACHE.get(self.note_id)
+        if cached is not None and cached[0] == raw_content:
+            return cached[1]
+
+        try:
+            segments = decode_note_content(raw_content)
+        except (ValueError, TypeError):
+            segments = [{"text": raw_content, "tags": []}]
+
+        markup = self._generate_markup(segments)
+        _PREVIEW_CACHE[self.note_id] = (raw_content, markup)
+        return markup
+
     def _generate_markup(self, segments: list[dict]) -> str:
         """
         Generates Pango markup from a list of text segments and their tags.
@@ -129,29 +210,12 @@ class NoteCard(Gtk.Box):
 
             opening_tags = []
             closing_tags = []
-            tags = seg.get("tags", [])
-            for tag in tags:
-                if tag == "bold":
-                    opening_tags.append("<b>")
-                    closing_tags.insert(0, "</b>")
-                elif tag == "italic":
-                    opening_tags.append("<i>")
-                    closing_tags.insert(0, "</i>")
-                elif tag == "underline":
-                    opening_tags.append("<u>")
-                    closing_tags.insert(0, "</u>")
-                elif tag == "strikethrough":
-                    opening_tags.append("<s>")
-                    closing_tags.insert(0, "</s>")
-                elif tag.startswith("text_color_"):
-                    c = tag.replace("text_color_", "")
-                    opening_tags.append(f'<span foreground="{c}">')
-                    closing_tags.insert(0, "</span>")
-                elif tag.startswith("font_size_"):
-                    s = tag.replace("font_size_", "")
-                    opening_tags.append(f'<span size="{s}pt">')
-                    closing_tags.insert(0, "</span>")
-            
+            for tag in seg.get("tags", []):
+                opening, closing = _tag_markup(tag)
+                opening_tags.append(opening)
+                closing_tags.append(closing)
+            closing_tags.reverse()
+
             full_markup += "".join(opening_tags) + safe_text + "".join(closing_tags)
 
         return full_markup.rstrip()
@@ -163,10 +227,13 @@ class NoteCard(Gtk.Box):
             hex_color (str): The new hexadecimal color string.
         """
         if not hex_color: hex_color = "#FFF59D"
-        provider = Gtk.CssProvider()
-        css = f".sticky-paper-card {{ background-color: {hex_color}; border-radius: 0px; min-height: 50px; }}"
-        provider.load_from_data(css.encode())
-        self.card_canvas.get_style_context().add_provider(provider, Gtk.STYLE_PROVIDER_PRIORITY_USER)
+        color_class = ensure_note_color_class(hex_color)
+        if color_class == self._color_class:
+            return
+        if self._color_class:
+            self.card_canvas.remove_css_class(self._color_class)
+        self.card_canvas.add_css_class(color_class)
+        self._color_class = color_class
 
     def setup_gestures(self):
         """Sets up gesture recognizers for click and right-click actions on the card."""
@@ -2,6 +2,7 @@ import builtins
 from gi.repository import Gtk, Adw, Gio, Gdk
 from config.config_manager import ConfigManager
 from config.config import get_supported_languages
+from sticky.sticky_styles import ensure_swatch_classes, swatch_class
 
 _ = builtins._
 
@@ -110,6 +111,7 @@ class SettingsView(Gtk.Box):
         # --- Palette Settings ---
         palette_expander = Adw.ExpanderRow(title=_("Color Palette"), subtitle=_("Customize sticker colors"))
         self.palette_buttons = []
+        self._palette_swatch_classes = {}
         current_palette = self.config.get("palette", [])
         
         palette_grid = Gtk.Grid(column_spacing=10, row_spacing=10)
@@ -186,13 +188,24 @@ class SettingsView(Gtk.Box):
     def _set_button_color(self, btn, color):
         """
         Applies the given color to a Gtk.Button's background using CSS.
+        The color comes from the shared swatch classes, so recoloring a button
+        only swaps its class instead of stacking another provider on it.
         Args:
             btn (Gtk.Button): The button widget to style.
             color (str): The hexadecimal color string (e.g., "#RRGGBB").
         """
-        cp = Gtk.CssProvider()
-        cp.load_from_data(f"button {{ background-color: {color}; border-radius: 50%; border: 1px solid rgba(0,0,0,0.2); }}".encode())
-        btn.get_style_context().add_provider(cp, Gtk.STYLE_PROVIDER_PRIORITY_USER)
+        ensure_swatch_classes((color,))
+        new_class = swatch_class(color)
+        old_class = self._palette_swatch_classes.get(btn)
+        if old_class == new_class:
+            return
+        if old_class is None:
+            btn.add_css_class("sw-round")
+            btn.add_css_class("sw-outlined")
+        else:
+            btn.remove_css_class(old_class)
+        btn.add_css_class(new_class)
+        self._palette_swatch_classes[btn] = new_class
 
     def on_color_btn_clicked(self, btn, index: int):
         """
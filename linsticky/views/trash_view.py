@@ -1,6 +1,6 @@
 import builtins
 from gi.repository import Gtk, Adw
-from views.main_view.note_card import NoteCard
+from views.main_view.note_card import NoteCard, forget_preview
 
 _ = builtins._
 
@@ -18,6 +18,8 @@ class TrashView(Gtk.Box):
         super().__init__(orientation=Gtk.Orientation.VERTICAL)
         self.db = db
         self.on_back_callback = on_back_callback
+        self._cards = {}
+        self._placeholder = None
 
         # --- Header ---
         header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
@@ -42,6 +44,17 @@ class TrashView(Gtk.Box):
 
         # --- Content ---
         self.flowbox = Gtk.FlowBox(valign=Gtk.Align.START, selection_mode=Gtk.SelectionMode.NONE)
+        self.flowbox.set_homogeneous(False)
+        self.flowbox.set_max_children_per_line(1)
+        self.flowbox.set_min_children_per_line(1)
+        self.flowbox.set_halign(Gtk.Align.FILL)
+        self.flowbox.set_valign(Gtk.Align.START)
+        self.flowbox.set_column_spacing(0)
+        self.flowbox.set_row_spacing(10)
+        self.flowbox.set_margin_top(10); self.flowbox.set_margin_bottom(10)
+        self.flowbox.set_margin_start(10); self.flowbox.set_margin_end(10)
+        # Cards are added incrementally, so keep them in database (id) order.
+        self.flowbox.set_sort_func(self._sort_cards)
         scrolled = Gtk.ScrolledWindow(child=self.flowbox, vexpand=True)
         scrolled.set_has_frame(False)
         self.append(scrolled)
@@ -61,46 +74,72 @@ class TrashView(Gtk.Box):
         if self.on_back_callback:
             self.on_back_callback()
 
-    def refresh_list(self):
-        """Refreshes the list of deleted notes from the database."""
-        while child := self.flowbox.get_first_child():
-            self.flowbox.remove(child)
-
-        self.flowbox.set_homogeneous(False)
-        self.flowbox.set_max_children_per_line(1)
-        self.flowbox.set_min_children_per_line(1)
-        self.flowbox.set_halign(Gtk.Align.FILL)
-        self.flowbox.set_valign(Gtk.Align.START)
-        self.flowbox.set_column_spacing(0)
-        self.flowbox.set_row_spacing(10)
-        self.flowbox.set_margin_top(10); self.flowbox.set_margin_bottom(10)
-        self.flowbox.set_margin_start(10); self.flowbox.set_margin_end(10)
+    @staticmethod
+    def _sort_cards(child_a: Gtk.FlowBoxChild, child_b: Gtk.FlowBoxChild) -> int:
+        """
+        Orders trashed note cards by note ID, like the database listing.
+        Args:
+            child_a (Gtk.FlowBoxChild): The first card's flow box child.
+            child_b (Gtk.FlowBoxChild): The second card's flow box child.
+        Returns:
+            int: A negative, zero or positive value, as for a comparison.
+        """
+        a, b = child_a.get_child(), child_b.get_child()
+        # The empty-trash placeholder is not a card and has no note ID.
+        return getattr(a, "note_id", 0) - getattr(b, "note_id", 0)
 
+    def refresh_list(self):
+        """
+        Brings the list of deleted notes in line with the database.
+        Only the cards of notes that left or entered the trash are removed or
+        created; the cards of all other notes are kept as they are.
+        """
         trash_items = self.db.all_trash()
+        trash_ids = {note['id'] for note in trash_items}
+
+        for note_id in [i for i in self._cards if i not in trash_ids]:
+            self.flowbox.remove(self._cards.pop(note_id).get_parent())
 
         if not trash_items:
-            placeholder_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10, valign=Gtk.Align.CENTER, halign=Gtk.Align.CENTER, vexpand=True)
-            lbl = Gtk.Label(label=_("Trash is empty"))
-            lbl.add_css_class("dim-label"); lbl.add_css_class("title-3")
-            icon = Gtk.Image.new_from_icon_name("user-trash-symbolic")
-            icon.set_pixel_size(64)
-            icon.add_css_class("dim-label")
-            placeholder_box.append(icon)
-            placeholder_box.append(lbl)
-            self.flowbox.append(placeholder_box)
-            child = placeholder_box.get_parent()
-            child.set_hexpand(True); child.set_halign(Gtk.Align.FILL)
+            if self._placeholder is None:
+                self._placeholder = self._build_placeholder()
+                self.flowbox.append(self._placeholder)
+                child = self._placeholder.get_parent()
+                child.set_hexpand(True); child.set_halign(Gtk.Align.FILL)
             return
 
+        if self._placeholder is not None:
+            self.flowbox.remove(self._placeholder.get_parent())
+            self._placeholder = None
+
         for note in trash_items:
+            if note['id'] in self._cards:
+                continue
             card = NoteCard(note, self.db, menu_callback=self.show_context_menu, refresh_callback=self.refresh_list)
             self.flowbox.append(card)
+            self._cards[card.note_id] = card
             flow_child = card.get_parent()
             if flow_child:
                 flow_child.set_can_focus(False)
                 flow_child.set_hexpand(True)
                 flow_child.set_halign(Gtk.Align.FILL)
 
+    def _build_placeholder(self) -> Gtk.Box:
+        """
+        Builds the placeholder shown while the trash is empty.
+        Returns:
+            Gtk.Box: The placeholder widget.
+        """
+        placeholder_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10, valign=Gtk.Align.CENTER, halign=Gtk.Align.CENTER, vexpand=True)
+        lbl = Gtk.Label(label=_("Trash is empty"))
+        lbl.add_css_class("dim-label"); lbl.add_css_class("title-3")
+        icon = Gtk.Image.new_from_icon_name("user-trash-symbolic")
+        icon.set_pixel_size(64)
+        icon.add_css_class("dim-label")
+        placeholder_box.append(icon)
+        placeholder_box.append(lbl)
+        return placeholder_box
+
     def show_context_menu(self, note_id, target_widget):
         """
         Displays a context menu for a trashed note.
@@ -134,6 +173,7 @@ class TrashView(Gtk.Box):
     def delete_permanently(self, note_id):
         """Permanently deletes a note from the database."""
         self.db.delete_permanently(note_id)
+        forget_preview(note_id)
         self.refresh_list()
 
     def on_empty_trash(self, btn):
@@ -153,7 +193,8 @@ class TrashView(Gtk.Box):
     def _on_empty_trash_confirm(self, dialog, response_id):
         """Callback for the empty trash confirmation dialog."""
         if response_id == "empty":
-            for note in self.db.all_trash():
-                self.db.delete_permanently(note['id'])
+            trash_ids = [note['id'] for note in self.db.all_trash()]
+            self.db.delete_all_trash()
+            forget_preview(*trash_ids)
             self.refresh_list()
         dialog.close()